@@ -3,7 +3,7 @@
 # requires-python = ">=3.10"
 # dependencies = [
 #     "pyarrow>=14.0.0",
-#     "huggingface_hub>=0.19.0",
+#     "huggingface_hub>=1.0.0",
 #     "orjson>=3.9.0",
 #     "tqdm>=4.66.0",
 # ]
@@ -25,18 +25,28 @@ Usage with uv:
 
 import argparse
 import os
+import re
 import sys
 from collections import Counter
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from multiprocessing import Manager
 from pathlib import Path
-from typing import Iterator
+from queue import Empty, Queue
+from typing import BinaryIO, Iterator
 
 import orjson
 import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.json as pj
 import pyarrow.parquet as pq
-from huggingface_hub import HfApi, create_repo
 from tqdm import tqdm
 
+# Must be set before huggingface_hub is imported, since it reads its config at import time.
+os.environ.setdefault("HF_XET_HIGH_PERFORMANCE", "1")
+
+from huggingface_hub import HfApi, create_repo  # noqa: E402
+
 
 REPO_ID = "cometadata/datacite-affiliations-matched-ror"
 ROR_VERSION = "v2.1-2026-01-15-ror-data"
@@ -45,6 +55,34 @@ SOURCE_TOOL = "https://github.com/cometadata/match-datacite-affiliations-to-ror-
 
 TARGET_SHARD_SIZE = 1 * 1024 * 1024 * 1024  # 1 GB
 BATCH_SIZE = 50_000
+ROW_GROUP_SIZE = 1_000_000
+ROW_GROUP_MAX_BYTES = 256 << 20  # caps buffered memory per worker for wide rows
+WRITE_BATCH_SIZE = 8192
+DATA_PAGE_SIZE = 1 << 20
+DICTIONARY_PAGE_SIZE = 4 << 20
+ZSTD_LEVEL = 3
+JSON_BLOCK_SIZE = 8 << 20  # 8 MB
+PROGRESS_INTERVAL = 0.5  # seconds between progress bar refreshes
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
+STRING_LITERAL = re.compile(rb'("(?:[^"\\]|\\.)*")')
+JSON_WHITESPACE = b" \t\r\n"
+BLANK_LINE_MARKERS = (b"\n\n", b"\n ", b"\n\t", b"\n\r")
+
+
+ROR_ID_COUNT = pa.struct([("ror_id", pa.string()), ("ror_name", pa.string()), ("count", pa.int64())])
+ENRICHED_AFFILIATION = pa.struct([
+    ("name", pa.string()),
+    ("affiliationIdentifier", pa.string()),
+    ("affiliationIdentifierScheme", pa.string()),
+    ("schemeUri", pa.string()),
+])
+ENRICHED_CREATOR = pa.struct([
+    ("name", pa.string()),
+    ("given_name", pa.string()),
+    ("family_name", pa.string()),
+    ("affiliation", pa.list_(ENRICHED_AFFILIATION)),
+])
 
 
 @dataclass
@@ -54,32 +92,123 @@ class FileConfig:
     is_json_array: bool = False
     is_string_array: bool = False
     shard_large: bool = False
+    sort_by: tuple[str, ...] = ()
+    # Mirrors the record types written by the Rust pipeline; None means infer from a sample.
+    schema: pa.Schema | None = None
+    stats_columns: tuple[str, ...] = ()
+    # Top-level columns that are unique per row, so a dictionary only costs space.
+    plain_columns: tuple[str, ...] = ()
+
+    @property
+    def stats_schema(self) -> pa.Schema | None:
+        if not self.stats_columns:
+            return None
+        return pa.schema([self.schema.field(name) for name in self.stats_columns])
 
 
 FILE_CONFIGS = [
-    FileConfig("doi_author_affiliations.jsonl", "doi_author_affiliations", shard_large=True),
-    FileConfig("enriched_records.jsonl", "enriched_records", shard_large=True),
-    FileConfig("ror_matches.jsonl", "ror_matches"),
-    FileConfig("ror_matches.failed.jsonl", "ror_matches_failed"),
-    FileConfig("unique_affiliations.json", "unique_affiliations", is_json_array=True, is_string_array=True),
-    FileConfig("existing_assignments.jsonl", "existing_assignments", shard_large=True),
-    FileConfig("existing_assignments_aggregated.jsonl", "existing_assignments_aggregated"),
-    FileConfig("disagreements.jsonl", "disagreements"),
+    FileConfig(
+        "doi_author_affiliations.jsonl",
+        "doi_author_affiliations",
+        shard_large=True,
+        schema=pa.schema([
+            ("doi", pa.string()),
+            ("author_idx", pa.int64()),
+            ("author_name", pa.string()),
+            ("affiliation_idx", pa.int64()),
+            ("affiliation", pa.string()),
+            ("affiliation_hash", pa.string()),
+            ("existing_ror_id", pa.string()),
+        ]),
+    ),
+    FileConfig(
+        "enriched_records.jsonl",
+        "enriched_records",
+        shard_large=True,
+        schema=pa.schema([("doi", pa.string()), ("creators", pa.list_(ENRICHED_CREATOR))]),
+    ),
+    FileConfig(
+        "ror_matches.jsonl",
+        "ror_matches",
+        sort_by=("ror_id",),
+        schema=pa.schema([
+            ("affiliation", pa.string()),
+            ("affiliation_hash", pa.string()),
+            ("ror_id", pa.string()),
+        ]),
+        stats_columns=("affiliation_hash", "ror_id"),
+        plain_columns=("affiliation_hash",),
+    ),
+    FileConfig(
+        "ror_matches.failed.jsonl",
+        "ror_matches_failed",
+        sort_by=("error",),
+        schema=pa.schema([
+            ("affiliation", pa.string()),
+            ("affiliation_hash", pa.string()),
+            ("error", pa.string()),
+        ]),
+        stats_columns=("error",),
+        plain_columns=("affiliation_hash",),
+    ),
+    FileConfig(
+        "unique_affiliations.json",
+        "unique_affiliations",
+        is_json_array=True,
+        is_string_array=True,
+        schema=pa.schema([("affiliation", pa.string())]),
+    ),
+    FileConfig(
+        "existing_assignments.jsonl",
+        "existing_assignments",
+        shard_large=True,
+        sort_by=("ror_id",),
+        schema=pa.schema([
+            ("doi", pa.string()),
+            ("author_idx", pa.int64()),
+            ("author_name", pa.string()),
+            ("affiliation", pa.string()),
+            ("ror_id", pa.string()),
+            ("ror_name", pa.string()),
+        ]),
+    ),
+    FileConfig(
+        "existing_assignments_aggregated.jsonl",
+        "existing_assignments_aggregated",
+        schema=pa.schema([
+            ("affiliation", pa.string()),
+            ("affiliation_hash", pa.string()),
+            ("ror_id", pa.string()),
+            ("ror_name", pa.string()),
+            ("count", pa.int64()),
+        ]),
+        stats_columns=("affiliation_hash", "count"),
+    ),
+    FileConfig(
+        "disagreements.jsonl",
+        "disagreements",
+        schema=pa.schema([
+            ("type", pa.string()),
+            ("affiliation", pa.string()),
+            ("affiliation_hash", pa.string()),
+            ("existing_ror_id", pa.string()),
+            ("existing_ror_name", pa.string()),
+            ("existing_count", pa.int64()),
+            ("matched_ror_id", pa.string()),
+            ("matched_ror_name", pa.string()),
+            ("ror_ids", pa.list_(ROR_ID_COUNT)),
+        ]),
+        stats_columns=("type", "existing_ror_id", "existing_ror_name", "matched_ror_id", "matched_ror_name"),
+    ),
 ]
 
 
-def count_lines(filepath: Path) -> int:
-    count = 0
-    with open(filepath, "rb") as f:
-        for _ in f:
-            count += 1
-    return count
-
-
-def count_json_array(filepath: Path) -> int:
-    with open(filepath, "rb") as f:
-        data = orjson.loads(f.read())
-    return len(data)
+def open_sequential(filepath: Path) -> BinaryIO:
+    """Open a file for one front-to-back read, asking the kernel for aggressive readahead."""
+    f = open(filepath, "rb")
+    if hasattr(os, "posix_fadvise"):
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    return f
 
 
 def get_file_size(filepath: Path) -> int:
@@ -87,42 +216,128 @@ def get_file_size(filepath: Path) -> int:
 
 
 def format_size(size_bytes: int) -> str:
-    for unit in ["B", "KB", "MB", "GB", "TB"]:
-        if size_bytes < 1024:
-            return f"{size_bytes:.2f} {unit}"
-        size_bytes /= 1024
-    return f"{size_bytes:.2f} PB"
+    # Each unit is 10 bits wide, so bit_length picks the unit without a division loop.
+    exponent = min(max(0, (size_bytes.bit_length() - 1) // 10), len(SIZE_UNITS) - 1)
+    return f"{size_bytes / (1 << (10 * exponent)):.2f} {SIZE_UNITS[exponent]}"
+
+
+def iter_jsonl_blocks(filepath: Path, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+    """Yield newline-aligned blocks from a JSONL file, optionally limited to [start, end)."""
+    remaining = (get_file_size(filepath) if end is None else end) - start
+    tail = b""
+    with open_sequential(filepath) as f:
+        f.seek(start)
+        while remaining > 0 and (chunk := f.read(min(JSON_BLOCK_SIZE, remaining))):
+            remaining -= len(chunk)
+            chunk = tail + chunk
+            cut = chunk.rfind(b"\n") + 1
+            block, tail = chunk[:cut], chunk[cut:]
+            if block and not block.isspace():
+                yield block
+    if tail and not tail.isspace():
+        yield tail
+
+
+def iter_string_array_blocks(filepath: Path) -> Iterator[bytes]:
+    """Stream a JSON array of strings as JSONL blocks of {"affiliation": item}.
+
+    String literals are copied through verbatim, so items are never decoded
+    into Python objects and the array is never held in memory whole. The text
+    between literals must be exactly "[" before the first, "," between two and
+    "]" after the last, ignoring whitespace.
+    """
+    tail = b""
+    seen_literal = False
+    with open_sequential(filepath) as f:
+        while chunk := f.read(JSON_BLOCK_SIZE):
+            parts = STRING_LITERAL.split(tail + chunk)
+            literals, tail = parts[1::2], parts[-1]
+            for separator in parts[0:-1:2]:
+                if separator.translate(None, JSON_WHITESPACE) != (b"," if seen_literal else b"["):
+                    raise ValueError(f"{filepath}: Expected an array of strings")
+                seen_literal = True
+            if literals:
+                yield b'{"affiliation":' + b'}\n{"affiliation":'.join(literals) + b"}\n"
+    if tail.translate(None, JSON_WHITESPACE) != (b"]" if seen_literal else b"[]"):
+        raise ValueError(f"{filepath}: Expected an array of strings")
+
+
+def count_block_records(block: bytes) -> int:
+    """Count the non-blank lines in a JSONL block, independently of the JSON parser."""
+    if block[:1].isspace() or any(marker in block for marker in BLANK_LINE_MARKERS):
+        # Only blocks that may contain blank lines pay for a per-line scan.
+        return sum(1 for line in block.split(b"\n") if line.strip())
+    return block.count(b"\n") + (not block.endswith(b"\n"))
+
+
+def parse_json_block(block: bytes, schema: pa.Schema) -> pa.Table:
+    """Parse a JSONL block with Arrow's JSON reader.
+
+    Fields not in schema are ignored, so extra keys in the source never fail a conversion.
+    """
+    parse_options = pj.ParseOptions(explicit_schema=schema, unexpected_field_behavior="ignore")
+    # A single record must fit in one Arrow block.
+    read_options = pj.ReadOptions(block_size=max(JSON_BLOCK_SIZE, len(block)))
+    return pj.read_json(pa.BufferReader(block), read_options=read_options, parse_options=parse_options)
+
+
+def iter_source_blocks(
+    filepath: Path, config: FileConfig, start: int = 0, end: int | None = None
+) -> Iterator[bytes]:
+    """Yield JSONL blocks for any source format; start and end only apply to JSONL files."""
+    if config.is_string_array:
+        return iter_string_array_blocks(filepath)
+    if config.is_json_array:
+        return iter_json_array_blocks(filepath)
+    return iter_jsonl_blocks(filepath, start, end)
 
 
-def iter_jsonl(filepath: Path) -> Iterator[dict]:
-    with open(filepath, "rb") as f:
-        for line_num, line in enumerate(f, 1):
-            if line.strip():
-                obj = orjson.loads(line)
-                if not isinstance(obj, dict):
-                    raise ValueError(
-                        f"{filepath}:{line_num}: Expected dict, got {type(obj).__name__}"
-                    )
-                yield obj
-
-
-def iter_json_array(filepath: Path, wrap_strings: bool = False) -> Iterator[dict]:
-    """If wrap_strings, string items become {"affiliation": item}."""
-    with open(filepath, "rb") as f:
+def iter_jsonl_tables(
+    filepath: Path, schema: pa.Schema, start: int = 0, end: int | None = None
+) -> Iterator[pa.Table]:
+    return (parse_json_block(block, schema) for block in iter_jsonl_blocks(filepath, start, end))
+
+
+def iter_json_array(filepath: Path) -> Iterator[dict]:
+    with open_sequential(filepath) as f:
         data = orjson.loads(f.read())
     for idx, item in enumerate(data):
         if isinstance(item, dict):
             yield item
-        elif wrap_strings and isinstance(item, str):
-            yield {"affiliation": item}
         else:
             raise ValueError(
                 f"{filepath}[{idx}]: Expected dict, got {type(item).__name__}"
             )
 
 
-def collect_stats(input_dir: Path) -> dict:
-    stats = {
+def iter_json_array_blocks(filepath: Path) -> Iterator[bytes]:
+    """Re-serialize a JSON array of objects as JSONL blocks of BATCH_SIZE records."""
+    records = list(iter_json_array(filepath))
+    for offset in range(0, len(records), BATCH_SIZE):
+        yield b"\n".join(map(orjson.dumps, records[offset:offset + BATCH_SIZE])) + b"\n"
+
+
+def count_values(counter: Counter, values: pa.ChunkedArray) -> None:
+    """Add the non-null values of an Arrow column to counter."""
+    counts = pc.value_counts(values.drop_null())
+    counter.update(dict(zip(counts.field("values").to_pylist(), counts.field("counts").to_pylist())))
+
+
+def concat_chunks(arrays: list[pa.ChunkedArray], type: pa.DataType = pa.string()) -> pa.ChunkedArray:
+    return pa.chunked_array([chunk for array in arrays for chunk in array.chunks], type=type)
+
+
+def normalize_errors(errors: pa.ChunkedArray) -> pa.ChunkedArray:
+    errors = pc.if_else(pc.equal(errors, ""), None, errors).fill_null("unknown")
+    return pc.if_else(
+        pc.greater(pc.utf8_length(errors), 100),
+        pc.binary_join_element_wise(pc.utf8_slice_codeunits(errors, 0, 100), "...", ""),
+        errors,
+    )
+
+
+def new_stats() -> dict:
+    return {
         "files": {},
         "total_records": 0,
         "total_size_bytes": 0,
@@ -144,263 +359,371 @@ def collect_stats(input_dir: Path) -> dict:
         },
     }
 
-    print("Collecting statistics...")
-
-    for config in FILE_CONFIGS:
-        filepath = input_dir / config.filename
-        if not filepath.exists():
-            print(f"  Warning: {config.filename} not found, skipping")
-            continue
-
-        size = get_file_size(filepath)
-
-        if config.is_json_array:
-            record_count = count_json_array(filepath)
-        else:
-            record_count = count_lines(filepath)
-
-        stats["files"][config.config_name] = {
-            "filename": config.filename,
-            "records": record_count,
-            "size_bytes": size,
-            "size_human": format_size(size),
-        }
-        stats["total_records"] += record_count
-        stats["total_size_bytes"] += size
-
-        print(f"  {config.filename}: {record_count:,} records ({format_size(size)})")
-
-    if "ror_matches" in stats["files"] and "unique_affiliations" in stats["files"]:
-        matched = stats["files"]["ror_matches"]["records"]
-        total = stats["files"]["unique_affiliations"]["records"]
-        if total > 0:
-            stats["match_rate"] = matched / total
-            print(f"\n  Match rate: {matched:,} / {total:,} = {stats['match_rate']:.2%}")
-
-    ror_matches_path = input_dir / "ror_matches.jsonl"
-    if ror_matches_path.exists():
-        print("\n  Collecting top ROR IDs...")
-        ror_counter: Counter = Counter()
-        for record in tqdm(iter_jsonl(ror_matches_path), desc="  Scanning matches"):
-            if "ror_id" in record:
-                ror_counter[record["ror_id"]] += 1
-        stats["top_ror_ids"] = ror_counter.most_common(20)
-        print(f"  Found {len(ror_counter):,} unique ROR IDs")
-
-    failed_path = input_dir / "ror_matches.failed.jsonl"
-    if failed_path.exists():
-        print("\n  Collecting error distribution...")
-        error_counter: Counter = Counter()
-        for record in tqdm(iter_jsonl(failed_path), desc="  Scanning errors"):
-            error = record.get("error") or "unknown"
-            if not isinstance(error, str):
-                error = str(error)
-            if len(error) > 100:
-                error = error[:100] + "..."
-            error_counter[error] += 1
-        stats["error_distribution"] = dict(error_counter.most_common(10))
-
-    stats["total_size_human"] = format_size(stats["total_size_bytes"])
-
-    collect_existing_assignment_stats(input_dir, stats)
-    collect_disagreement_stats(input_dir, stats)
-
-    overlap = stats["existing_assignments"].get("overlap_with_new_matches", 0)
-    disagreements = stats["disagreements"].get("total_count", 0)
-    if overlap > 0:
-        agreement_count = overlap - disagreements
-        stats["existing_assignments"]["agreement_count"] = agreement_count
-        stats["existing_assignments"]["agreement_rate"] = agreement_count / overlap
-        print(f"\n  Agreement rate: {agreement_count:,} / {overlap:,} = {stats['existing_assignments']['agreement_rate']:.2%}")
-
-    return stats
-
-
-def collect_existing_assignment_stats(input_dir: Path, stats: dict) -> None:
-    """Collect statistics about pre-existing ROR assignments."""
-    agg_path = input_dir / "existing_assignments_aggregated.jsonl"
-    if not agg_path.exists():
-        print("\n  existing_assignments_aggregated.jsonl not found, skipping existing assignment stats")
-        return
-
-    print("\n  Collecting existing assignment statistics...")
-
-    existing_hashes = set()
-    total_records = 0
-
-    for record in tqdm(iter_jsonl(agg_path), desc="  Scanning aggregated assignments"):
-        existing_hashes.add(record.get("affiliation_hash"))
-        total_records += record.get("count", 1)
-
-    stats["existing_assignments"]["unique_affiliations"] = len(existing_hashes)
-    stats["existing_assignments"]["total_records"] = total_records
-
-    ror_matches_path = input_dir / "ror_matches.jsonl"
-    if ror_matches_path.exists():
-        overlap_count = 0
-        for record in tqdm(iter_jsonl(ror_matches_path), desc="  Calculating overlap with new matches"):
-            if record.get("affiliation_hash") in existing_hashes:
-                overlap_count += 1
-        stats["existing_assignments"]["overlap_with_new_matches"] = overlap_count
-        print(f"  Overlap with new matches: {overlap_count:,}")
-
-    print(f"  Unique affiliations with existing assignments: {len(existing_hashes):,}")
-    print(f"  Total existing assignment records: {total_records:,}")
-
-
-def collect_disagreement_stats(input_dir: Path, stats: dict) -> None:
-    """Collect statistics about disagreements between new and existing assignments."""
-    disagreements_path = input_dir / "disagreements.jsonl"
-    if not disagreements_path.exists():
-        print("\n  disagreements.jsonl not found, skipping disagreement stats")
-        return
-
-    print("\n  Collecting disagreement statistics...")
-
-    type_counter: Counter = Counter()
-    pattern_counter: Counter = Counter()
-
-    for record in tqdm(iter_jsonl(disagreements_path), desc="  Scanning disagreements"):
-        disagreement_type = record.get("type", "unknown")
-        type_counter[disagreement_type] += 1
-
-        if disagreement_type == "match":
-            existing_id = record.get("existing_ror_id", "unknown")
-            matched_id = record.get("matched_ror_id", "unknown")
-            existing_name = record.get("existing_ror_name", "")
-            matched_name = record.get("matched_ror_name", "")
-            pattern_counter[(existing_id, existing_name, matched_id, matched_name)] += 1
-
-    total_disagreements = sum(type_counter.values())
-    stats["disagreements"]["total_count"] = total_disagreements
-    stats["disagreements"]["by_type"] = dict(type_counter)
-
-    stats["disagreements"]["top_patterns"] = [
-        {
-            "existing_ror_id": existing_id,
-            "existing_ror_name": existing_name,
-            "matched_ror_id": matched_id,
-            "matched_ror_name": matched_name,
-            "count": count,
-        }
-        for (existing_id, existing_name, matched_id, matched_name), count
-        in pattern_counter.most_common(10)
-    ]
 
-    overlap = stats["existing_assignments"].get("overlap_with_new_matches", 0)
-    if overlap > 0:
-        stats["disagreements"]["disagreement_rate"] = total_disagreements / overlap
-
-    print(f"  Total disagreements: {total_disagreements:,}")
-    print(f"  By type: {dict(type_counter)}")
-    if overlap > 0:
-        print(f"  Disagreement rate: {total_disagreements:,} / {overlap:,} = {stats['disagreements']['disagreement_rate']:.2%}")
+@dataclass
+class StatsAccumulator:
+    """Running statistics, updated from each Arrow table as a file is read."""
+
+    ror_counter: Counter = field(default_factory=Counter)
+    error_counter: Counter = field(default_factory=Counter)
+    match_hashes: list[pa.ChunkedArray] = field(default_factory=list)
+    existing_hashes: list[pa.ChunkedArray] = field(default_factory=list)
+    existing_total: int = 0
+    type_counter: Counter = field(default_factory=Counter)
+    match_patterns: list[pa.Table] = field(default_factory=list)
+    seen: set = field(default_factory=set)
+
+    def update(self, config_name: str, table: pa.Table) -> None:
+        if config_name == "ror_matches":
+            count_values(self.ror_counter, table["ror_id"])
+            self.match_hashes.append(table["affiliation_hash"])
+        elif config_name == "ror_matches_failed":
+            count_values(self.error_counter, normalize_errors(table["error"]))
+        elif config_name == "existing_assignments_aggregated":
+            self.existing_hashes.append(table["affiliation_hash"])
+            self.existing_total += pc.sum(table["count"].fill_null(1)).as_py() or 0
+        elif config_name == "disagreements":
+            types = table["type"].fill_null("unknown")
+            count_values(self.type_counter, types)
+            matches = table.filter(pc.equal(types, "match"))
+            self.match_patterns.append(pa.table({
+                "existing_ror_id": matches["existing_ror_id"].fill_null("unknown"),
+                "existing_ror_name": matches["existing_ror_name"].fill_null(""),
+                "matched_ror_id": matches["matched_ror_id"].fill_null("unknown"),
+                "matched_ror_name": matches["matched_ror_name"].fill_null(""),
+            }))
+
+    def merge(self, other: "StatsAccumulator") -> None:
+        self.ror_counter.update(other.ror_counter)
+        self.error_counter.update(other.error_counter)
+        self.match_hashes.extend(other.match_hashes)
+        self.existing_hashes.extend(other.existing_hashes)
+        self.existing_total += other.existing_total
+        self.type_counter.update(other.type_counter)
+        self.match_patterns.extend(other.match_patterns)
+        self.seen.update(other.seen)
+
+    def finish(self, stats: dict) -> None:
+        if "ror_matches" in stats["files"] and "unique_affiliations" in stats["files"]:
+            matched = stats["files"]["ror_matches"]["records"]
+            total = stats["files"]["unique_affiliations"]["records"]
+            if total > 0:
+                stats["match_rate"] = matched / total
+                print(f"\n  Match rate: {matched:,} / {total:,} = {stats['match_rate']:.2%}")
+
+        if "ror_matches" in self.seen:
+            stats["top_ror_ids"] = self.ror_counter.most_common(20)
+            print(f"\n  Found {len(self.ror_counter):,} unique ROR IDs")
+
+        if "ror_matches_failed" in self.seen:
+            stats["error_distribution"] = dict(self.error_counter.most_common(10))
+
+        stats["total_size_human"] = format_size(stats["total_size_bytes"])
+
+        self.finish_existing_assignments(stats)
+        self.finish_disagreements(stats)
+
+        overlap = stats["existing_assignments"].get("overlap_with_new_matches", 0)
+        disagreements = stats["disagreements"].get("total_count", 0)
+        if overlap > 0:
+            agreement_count = overlap - disagreements
+            stats["existing_assignments"]["agreement_count"] = agreement_count
+            stats["existing_assignments"]["agreement_rate"] = agreement_count / overlap
+            print(f"\n  Agreement rate: {agreement_count:,} / {overlap:,} = {stats['existing_assignments']['agreement_rate']:.2%}")
+
+    def finish_existing_assignments(self, stats: dict) -> None:
+        """Statistics about pre-existing ROR assignments."""
+        if "existing_assignments_aggregated" not in self.seen:
+            print("\n  existing_assignments_aggregated.jsonl not found, skipping existing assignment stats")
+            return
+
+        existing_hashes = pc.unique(concat_chunks(self.existing_hashes))
+        stats["existing_assignments"]["unique_affiliations"] = len(existing_hashes)
+        stats["existing_assignments"]["total_records"] = self.existing_total
+
+        if "ror_matches" in self.seen:
+            in_existing = pc.is_in(concat_chunks(self.match_hashes), value_set=existing_hashes)
+            overlap_count = pc.sum(in_existing).as_py() or 0
+            stats["existing_assignments"]["overlap_with_new_matches"] = overlap_count
+            print(f"\n  Overlap with new matches: {overlap_count:,}")
+
+        print(f"  Unique affiliations with existing assignments: {len(existing_hashes):,}")
+        print(f"  Total existing assignment records: {self.existing_total:,}")
+
+    def finish_disagreements(self, stats: dict) -> None:
+        """Statistics about disagreements between new and existing assignments."""
+        if "disagreements" not in self.seen:
+            print("\n  disagreements.jsonl not found, skipping disagreement stats")
+            return
+
+        total_disagreements = sum(self.type_counter.values())
+        stats["disagreements"]["total_count"] = total_disagreements
+        stats["disagreements"]["by_type"] = dict(self.type_counter)
+
+        if self.match_patterns:
+            patterns = pa.concat_tables(self.match_patterns)
+            # Single-threaded grouping keeps first-seen group order, so ties sort like Counter.most_common.
+            top_patterns = (
+                patterns.group_by(patterns.column_names, use_threads=False)
+                .aggregate([([], "count_all")])
+                .select(patterns.column_names + ["count_all"])
+                .rename_columns(patterns.column_names + ["count"])
+                .sort_by([("count", "descending")])
+                .slice(0, 10)
+            )
+            stats["disagreements"]["top_patterns"] = top_patterns.to_pylist()
+
+        overlap = stats["existing_assignments"].get("overlap_with_new_matches", 0)
+        if overlap > 0:
+            stats["disagreements"]["disagreement_rate"] = total_disagreements / overlap
+
+        print(f"\n  Total disagreements: {total_disagreements:,}")
+        print(f"  By type: {dict(self.type_counter)}")
+        if overlap > 0:
+            print(f"  Disagreement rate: {total_disagreements:,} / {overlap:,} = {stats['disagreements']['disagreement_rate']:.2%}")
+
+
+def report_progress(progress: Queue | None, records: int) -> None:
+    if progress is not None:
+        progress.put(records)
+
+
+def scan_file(
+    filepath: Path, config: FileConfig, progress: Queue | None = None
+) -> tuple[StatsAccumulator, int]:
+    """Collect stats for a file that is not being converted. Runs in a worker process."""
+    acc = StatsAccumulator()
+    record_count = 0
+    if config.stats_schema is not None:
+        for table in iter_jsonl_tables(filepath, config.stats_schema):
+            acc.update(config.config_name, table)
+            record_count += table.num_rows
+            report_progress(progress, table.num_rows)
+    else:
+        for block in iter_source_blocks(filepath, config):
+            records = count_block_records(block)
+            record_count += records
+            report_progress(progress, records)
+    return acc, record_count
 
 
 def infer_schema_from_sample(filepath: Path, config: FileConfig, sample_size: int = 1000) -> pa.Schema:
-    if config.is_json_array:
-        records = list(iter_json_array(filepath, wrap_strings=config.is_string_array))[:sample_size]
-    else:
-        records = []
-        for i, record in enumerate(iter_jsonl(filepath)):
-            if i >= sample_size:
-                break
-            records.append(record)
-
-    if not records:
+    block = next(iter_source_blocks(filepath, config), b"")
+    sample = b"\n".join(block.split(b"\n", sample_size)[:sample_size])
+    if sample.isspace() or not sample:
         raise ValueError(f"No records found in {filepath}")
 
-    return pa.Table.from_pylist(records).schema
+    return pj.read_json(pa.BufferReader(sample)).schema
 
 
-def convert_to_parquet(
-    input_dir: Path,
-    output_dir: Path,
-    config: FileConfig,
-    stats: dict,
-) -> list[Path]:
-    filepath = input_dir / config.filename
-    if not filepath.exists():
-        print(f"Warning: {config.filename} not found, skipping")
-        return []
+def shard_ranges(filepath: Path, num_shards: int) -> list[tuple[int, int]]:
+    """Split a JSONL file into num_shards byte ranges that start on line boundaries."""
+    size = get_file_size(filepath)
+    offsets = [0]
+    with open(filepath, "rb") as f:
+        for shard_idx in range(1, num_shards):
+            f.seek(max(size * shard_idx // num_shards - 1, offsets[-1]))
+            f.readline()
+            offsets.append(f.tell())
+    offsets.append(size)
+    return list(zip(offsets, offsets[1:]))
+
 
+def plan_conversion(filepath: Path, output_dir: Path, config: FileConfig) -> list[tuple]:
+    """Return convert_to_parquet arguments, one tuple per output shard."""
     config_output_dir = output_dir / "data" / config.config_name
     config_output_dir.mkdir(parents=True, exist_ok=True)
+    # Drop shards from failed or earlier runs so they are never uploaded next to the new ones.
+    for stale in config_output_dir.glob("train-*.parquet"):
+        stale.unlink()
 
     file_size = get_file_size(filepath)
-    record_count = stats["files"].get(config.config_name, {}).get("records", 0)
 
     if config.shard_large and file_size > TARGET_SHARD_SIZE:
         num_shards = max(1, int(file_size / TARGET_SHARD_SIZE) + 1)
-        records_per_shard = record_count // num_shards + 1
+        ranges = shard_ranges(filepath, num_shards)
     else:
         num_shards = 1
-        records_per_shard = record_count
+        ranges = [(0, file_size)]
 
     print(f"\nConverting {config.filename} to {num_shards} shard(s)...")
 
-    schema = infer_schema_from_sample(filepath, config)
+    schema = config.schema or infer_schema_from_sample(filepath, config)
     print(f"  Schema: {schema}")
 
-    if config.is_json_array:
-        record_iter = iter_json_array(filepath, wrap_strings=config.is_string_array)
-    else:
-        record_iter = iter_jsonl(filepath)
+    return [
+        (filepath, config_output_dir / f"train-{shard_idx:05d}-of-{num_shards:05d}.parquet", config, schema, start, end)
+        for shard_idx, (start, end) in enumerate(ranges)
+    ]
 
-    output_files = []
-    current_shard = 0
-    batch = []
-    records_in_shard = 0
-    writer: pq.ParquetWriter | None = None
 
-    def get_shard_path(shard_idx: int) -> Path:
-        return config_output_dir / f"train-{shard_idx:05d}-of-{num_shards:05d}.parquet"
+def open_parquet_writer(
+    output_path: Path, schema: pa.Schema, plain_columns: tuple[str, ...] = ()
+) -> pq.ParquetWriter:
+    return pq.ParquetWriter(
+        output_path,
+        schema,
+        compression="zstd",
+        compression_level=ZSTD_LEVEL,
+        # A column list only reaches top-level leaves, so plain_columns is only set on flat schemas.
+        use_dictionary=[name for name in schema.names if name not in plain_columns] if plain_columns else True,
+        dictionary_pagesize_limit=DICTIONARY_PAGE_SIZE,
+        write_statistics=True,
+        data_page_version="2.0",
+        write_batch_size=WRITE_BATCH_SIZE,
+        data_page_size=DATA_PAGE_SIZE,
+    )
 
-    def open_writer(shard_idx: int) -> pq.ParquetWriter:
-        path = get_shard_path(shard_idx)
-        return pq.ParquetWriter(path, schema, compression="snappy")
 
-    def write_batch(w: pq.ParquetWriter, records: list[dict]) -> None:
-        if records:
-            table = pa.Table.from_pylist(records, schema=schema)
-            w.write_table(table)
+def convert_to_parquet(
+    filepath: Path,
+    output_path: Path,
+    config: FileConfig,
+    schema: pa.Schema,
+    start: int = 0,
+    end: int | None = None,
+    progress: Queue | None = None,
+) -> tuple[StatsAccumulator, int, int]:
+    """Convert one byte range of a source file to a Parquet shard. Runs in a worker process.
+
+    Returns the stats, the number of source records and the number of rows written.
+    Source records are counted from the raw blocks, so the two only agree if no
+    record was lost between reading and writing.
+    """
+    acc = StatsAccumulator()
+    source_records = 0
+    rows_written = 0
+
+    # Parsed blocks are small; buffer them so each write_table call emits one full row group.
+    pending: list[pa.Table] = []
+    pending_rows = 0
+    pending_bytes = 0
+
+    def write_row_group(writer: pq.ParquetWriter, table: pa.Table) -> None:
+        nonlocal rows_written
+        # Sorting within the row group gives long dictionary/RLE runs and tight min/max statistics.
+        if config.sort_by:
+            table = table.sort_by([(column, "ascending") for column in config.sort_by])
+        writer.write_table(table, row_group_size=ROW_GROUP_SIZE)
+        rows_written += table.num_rows
+
+    with open_parquet_writer(output_path, schema, config.plain_columns) as writer:
+        for block in iter_source_blocks(filepath, config, start, end):
+            source_records += count_block_records(block)
+            table = parse_json_block(block, schema)
+            acc.update(config.config_name, table)
+            report_progress(progress, table.num_rows)
+            pending.append(table)
+            pending_rows += table.num_rows
+            pending_bytes += table.nbytes
+
+            while pending_rows >= ROW_GROUP_SIZE or (pending_rows and pending_bytes >= ROW_GROUP_MAX_BYTES):
+                combined = pa.concat_tables(pending)
+                write_row_group(writer, combined.slice(0, ROW_GROUP_SIZE))
+                rest = combined.slice(ROW_GROUP_SIZE)
+                pending, pending_rows, pending_bytes = [rest], rest.num_rows, rest.nbytes
+
+        if pending_rows:
+            write_row_group(writer, pa.concat_tables(pending))
+
+    return acc, source_records, rows_written
+
+
+def process_files(
+    input_dir: Path,
+    output_dir: Path | None = None,
+    configs_to_convert: list[FileConfig] | None = None,
+    workers: int | None = None,
+) -> dict:
+    """Collect stats for every file, converting configs_to_convert to Parquet on the same read.
+
+    Files and shards are independent, so each runs in its own worker process.
+    """
+    stats = new_stats()
+    acc = StatsAccumulator()
+    jobs = []
 
-    pbar = tqdm(total=record_count, desc=f"  Processing")
-    writer = open_writer(current_shard)
+    for config in FILE_CONFIGS:
+        filepath = input_dir / config.filename
+        if not filepath.exists():
+            print(f"  Warning: {config.filename} not found, skipping")
+            continue
 
-    for record in record_iter:
-        batch.append(record)
-        records_in_shard += 1
-        pbar.update(1)
+        acc.seen.add(config.config_name)
+        if configs_to_convert and config in configs_to_convert:
+            jobs.extend((config, convert_to_parquet, args) for args in plan_conversion(filepath, output_dir, config))
+        else:
+            jobs.append((config, scan_file, (filepath, config)))
+
+    record_counts = Counter()
+    shard_rows: dict[str, dict[str, int]] = {}
+    max_workers = max(1, min(len(jobs), workers or os.cpu_count() or 1))
+    with Manager() as manager, ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Workers report records as they parse them, so the bar moves within large files too.
+        progress = manager.Queue()
+        futures = [executor.submit(fn, *args, progress=progress) for _, fn, args in jobs]
+        with tqdm(desc="  Processing", unit=" records", unit_scale=True) as pbar:
+            pending = set(futures)
+            while pending:
+                _, pending = wait(pending, timeout=PROGRESS_INTERVAL)
+                try:
+                    while True:
+                        pbar.update(progress.get_nowait())
+                except Empty:
+                    pass
+
+        # Merge in job order so stats do not depend on which worker finishes first.
+        for (config, fn, args), future in zip(jobs, futures):
+            if fn is convert_to_parquet:
+                part_acc, record_count, rows_written = future.result()
+                shard_rows.setdefault(config.config_name, {})[args[1].name] = rows_written
+            else:
+                part_acc, record_count = future.result()
+            acc.merge(part_acc)
+            record_counts[config.config_name] += record_count
+
+    print()
+    for config in FILE_CONFIGS:
+        if config.config_name not in acc.seen:
+            continue
 
-        if len(batch) >= BATCH_SIZE:
-            write_batch(writer, batch)
-            batch = []
+        size = get_file_size(input_dir / config.filename)
+        record_count = record_counts[config.config_name]
+        stats["files"][config.config_name] = {
+            "filename": config.filename,
+            "records": record_count,
+            "size_bytes": size,
+            "size_human": format_size(size),
+        }
+        stats["total_records"] += record_count
+        stats["total_size_bytes"] += size
 
-        if num_shards > 1 and records_in_shard >= records_per_shard and current_shard < num_shards - 1:
-            write_batch(writer, batch)
-            batch = []
-            writer.close()
-            output_files.append(get_shard_path(current_shard))
-            current_shard += 1
-            records_in_shard = 0
-            writer = open_writer(current_shard)
+        print(f"  {config.filename}: {record_count:,} records ({format_size(size)})")
+
+        if config.config_name in shard_rows:
+            shards = shard_rows[config.config_name]
+            stats["files"][config.config_name]["shards"] = shards
+            total_rows = sum(shards.values())
+            print(f"    Written {total_rows:,} rows to {len(shards)} file(s)")
+            if total_rows != record_count:
+                print(f"    WARNING: Row count mismatch! Expected {record_count:,}, got {total_rows:,}")
+
+    acc.finish(stats)
+    return stats
+
+
+def collect_stats(input_dir: Path, workers: int | None = None) -> dict:
+    print("Collecting statistics...")
+    return process_files(input_dir, workers=workers)
 
-    write_batch(writer, batch)
-    writer.close()
-    output_files.append(get_shard_path(current_shard))
-    pbar.close()
 
-    total_rows = 0
-    for f in output_files:
-        if f.exists():
-            total_rows += pq.read_metadata(f).num_rows
+def dump_json(path: Path, obj) -> None:
+    path.write_bytes(orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
 
-    print(f"  Written {total_rows:,} rows to {len(output_files)} file(s)")
-    if total_rows != record_count:
-        print(f"  WARNING: Row count mismatch! Expected {record_count:,}, got {total_rows:,}")
 
-    return output_files
+def save_stats(stats: dict, stats_path: Path) -> None:
+    dump_json(stats_path, stats)
+    print(f"Stats saved to: {stats_path}")
 
 
 def generate_readme(stats: dict, output_dir: Path) -> Path:
@@ -531,7 +854,8 @@ Flattened author-affiliation pairs extracted from DataCite records. Each row rep
 - `author_name` (string): Name of the author
 - `affiliation_idx` (int): Index of the affiliation for this author
 - `affiliation` (string): Raw affiliation string
-- `affiliation_hash` (string): MD5 hash of the normalized affiliation string
+- `affiliation_hash` (string): xxh3-64 hash of the affiliation string, as 16 hex characters
+- `existing_ror_id` (string): ROR ID already assigned in the source record, if any
 
 ### `enriched_records`
 
@@ -547,7 +871,7 @@ Successful affiliation-to-ROR matches.
 
 **Schema:**
 - `affiliation` (string): Raw affiliation string
-- `affiliation_hash` (string): MD5 hash of the normalized affiliation string
+- `affiliation_hash` (string): xxh3-64 hash of the affiliation string, as 16 hex characters
 - `ror_id` (string): Matched ROR ID
 
 ### `ror_matches_failed`
@@ -556,7 +880,7 @@ Affiliations that could not be matched to a ROR ID.
 
 **Schema:**
 - `affiliation` (string): Raw affiliation string
-- `affiliation_hash` (string): MD5 hash of the normalized affiliation string
+- `affiliation_hash` (string): xxh3-64 hash of the affiliation string, as 16 hex characters
 - `error` (string): Reason for match failure
 
 ### `unique_affiliations`
@@ -584,7 +908,7 @@ Aggregated view of pre-existing ROR assignments, grouped by affiliation string a
 
 **Schema:**
 - `affiliation` (string): Raw affiliation string
-- `affiliation_hash` (string): MD5 hash of the normalized affiliation string
+- `affiliation_hash` (string): xxh3-64 hash of the affiliation string, as 16 hex characters
 - `ror_id` (string): Pre-existing ROR ID
 - `ror_name` (string): Name of the ROR organization
 - `count` (int): Number of occurrences of this affiliation-ROR pair
@@ -596,7 +920,7 @@ Cases where the newly matched ROR ID differs from a pre-existing ROR assignment,
 **Schema (type="match"):**
 - `type` (string): "match" - disagreement between new match and existing assignment
 - `affiliation` (string): Raw affiliation string
-- `affiliation_hash` (string): MD5 hash of the normalized affiliation string
+- `affiliation_hash` (string): xxh3-64 hash of the affiliation string, as 16 hex characters
 - `existing_ror_id` (string): Pre-existing ROR ID in DataCite
 - `existing_ror_name` (string): Name of existing ROR organization
 - `existing_count` (int): Occurrences of this existing assignment
@@ -606,7 +930,7 @@ Cases where the newly matched ROR ID differs from a pre-existing ROR assignment,
 **Schema (type="user"):**
 - `type` (string): "user" - multiple conflicting user-submitted ROR IDs
 - `affiliation` (string): Raw affiliation string
-- `affiliation_hash` (string): MD5 hash of the normalized affiliation string
+- `affiliation_hash` (string): xxh3-64 hash of the affiliation string, as 16 hex characters
 - `ror_ids` (list): List of conflicting ROR assignments with counts
 
 ## Statistics
@@ -720,31 +1044,15 @@ def upload_to_hf(
 
     print(f"\nUploading files to {repo_id}...")
 
-    readme_path = output_dir / "README.md"
-    if readme_path.exists():
-        api.upload_file(
-            path_or_fileobj=str(readme_path),
-            path_in_repo="README.md",
-            repo_id=repo_id,
-            repo_type="dataset",
-            token=token,
-        )
-        print("  Uploaded README.md")
-
-    data_dir = output_dir / "data"
-    if data_dir.exists():
-        for config_dir in sorted(data_dir.iterdir()):
-            if config_dir.is_dir():
-                parquet_files = sorted(config_dir.glob("*.parquet"))
-                for pf in tqdm(parquet_files, desc=f"  Uploading {config_dir.name}"):
-                    path_in_repo = f"data/{config_dir.name}/{pf.name}"
-                    api.upload_file(
-                        path_or_fileobj=str(pf),
-                        path_in_repo=path_in_repo,
-                        repo_id=repo_id,
-                        repo_type="dataset",
-                        token=token,
-                    )
+    # One commit for the card and every shard; huggingface_hub uploads the LFS files concurrently.
+    api.upload_folder(
+        folder_path=str(output_dir),
+        repo_id=repo_id,
+        repo_type="dataset",
+        allow_patterns=["README.md", "data/*/train-*.parquet"],
+        commit_message="Upload dataset",
+        token=token,
+    )
 
     repo_url = f"https://huggingface.co/datasets/{repo_id}"
     print(f"\nUpload complete: {repo_url}")
@@ -761,21 +1069,38 @@ def verify_conversion(output_dir: Path, stats: dict) -> bool:
         if not config_dir.exists():
             continue
 
-        expected = stats["files"].get(config.config_name, {}).get("records", 0)
-        actual = 0
+        info = stats["files"].get(config.config_name, {})
+        expected = info.get("records", 0)
+        parquet_files = sorted(config_dir.glob("*.parquet"))
 
-        for pf in config_dir.glob("*.parquet"):
-            actual += pq.read_metadata(pf).num_rows
+        # Shards written by this run are counted in memory; only other files need their footers read.
+        shards = info.get("shards")
+        if shards is None:
+            actual = sum(pq.read_metadata(pf).num_rows for pf in parquet_files)
+            unexpected = []
+        else:
+            actual = sum(shards.values())
+            unexpected = [pf.name for pf in parquet_files if pf.name not in shards]
 
-        status = "✓" if actual == expected else "✗"
+        ok = actual == expected and not unexpected
+        status = "✓" if ok else "✗"
         print(f"  {status} {config.config_name}: {actual:,} / {expected:,}")
+        if unexpected:
+            print(f"    Files not written by this run: {', '.join(unexpected)}")
 
-        if actual != expected:
+        if not ok:
             all_ok = False
 
     return all_ok
 
 
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Convert DataCite-ROR output to Parquet and upload to HuggingFace"
@@ -830,6 +1155,11 @@ def main():
         choices=[c.config_name for c in FILE_CONFIGS],
         help="Only process specific files (by config name)",
     )
+    parser.add_argument(
+        "--workers",
+        type=positive_int,
+        help="Number of worker processes for scanning and conversion (default: CPU count)",
+    )
 
     args = parser.parse_args()
 
@@ -839,14 +1169,12 @@ def main():
         configs_to_process = [c for c in FILE_CONFIGS if c.config_name in args.files]
 
     args.output_dir.mkdir(parents=True, exist_ok=True)
-    stats = collect_stats(args.input_dir)
+    stats_path = args.output_dir / "stats.json"
 
     if args.stats_only:
+        stats = collect_stats(args.input_dir, args.workers)
         print("\nStats collection complete.")
-        stats_path = args.output_dir / "stats.json"
-        with open(stats_path, "wb") as f:
-            f.write(orjson.dumps(stats, option=orjson.OPT_INDENT_2))
-        print(f"Stats saved to: {stats_path}")
+        save_stats(stats, stats_path)
         return
 
     if not args.upload_only:
@@ -854,8 +1182,9 @@ def main():
         print("Converting to Parquet format...")
         print("=" * 60)
 
-        for config in configs_to_process:
-            convert_to_parquet(args.input_dir, args.output_dir, config, stats)
+        # Files not selected with --files are still scanned so the dataset card has full stats.
+        stats = process_files(args.input_dir, args.output_dir, configs_to_process, args.workers)
+        save_stats(stats, stats_path)
 
         generate_readme(stats, args.output_dir)
 
@@ -866,6 +1195,10 @@ def main():
                 print("Aborting.")
                 sys.exit(1)
 
+    # Upload needs no stats; they are only reloaded to rebuild a missing dataset card.
+    if args.upload_only and not (args.output_dir / "README.md").exists() and stats_path.exists():
+        generate_readme(orjson.loads(stats_path.read_bytes()), args.output_dir)
+
     if not args.convert_only:
         if not token:
             print("\nNo HuggingFace token provided. Set HF_TOKEN env var or use --token.")